@@ -1,79 +1,232 @@
 #!/usr/bin/env python3
 import argparse, csv, pathlib, sys
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
 
 try:
-    import yaml
+    import pandas as pd  # optional: typed, vectorized CSV parsing
 except Exception:
-    yaml = None
-
-
-def load_rows(csv_path):
-    rows = []
-    with open(csv_path) as f:
-        r = csv.DictReader(f)
-        for row in r:
-            # coerce selected ints if present
-            for k in ["time_ns","popped","edges_scanned","heap_pushes","B","k","seed","threads","n","m","B_prime","mem_bytes"]:
-                if k in row and row[k] not in (None, ""):
-                    try:
-                        row[k] = int(row[k])
-                    except Exception:
-                        pass
-            rows.append(row)
-    return rows
-
-
-def best_rows_by_impl(rows):
-    # Choose the row with the largest 'popped' per (impl, lang, graph), tie-breaker: smallest time_ns
+    pd = None
+try:
+    import tabulate  # optional: used by DataFrame.to_markdown
+except Exception:
+    tabulate = None
+try:
+    # optional: multi-threaded CSV parsing and a binary sidecar cache for repeat runs
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.feather as feather
+except Exception:
+    pa = pacsv = feather = None
+try:
+    import numpy as np  # optional: arrays for the numba kernel
+except Exception:
+    np = None
+
+CSV_BUFFER = 1 << 20  # fewer read() syscalls on multi-hundred-MB sweeps
+GROUP_COLS = ("impl", "lang", "graph")
+# best_frame uses the numba kernel from this many rows on; below it, numba's import and JIT
+# (cache) load cost more than the kernel saves over the sort path
+NUMBA_MIN_ROWS = 2_000_000
+INT_COLS = ["time_ns","popped","edges_scanned","heap_pushes","B","k","seed","threads","n","m","B_prime","mem_bytes"]
+# Only the compared columns get an int64 type in DataFrames. The rest are display-only and kept as
+# text: B_prime is u64::MAX (18446744073709551615) when the bound is never reached, beyond int64.
+COMPARE_COLS = ["popped", "time_ns"]
+TEXT_COLS = [k for k in INT_COLS if k not in COMPARE_COLS]
+
+
+def load_frame(csv_path):
+    # Reuse <csv>.feather when it is at least as new as the CSV; otherwise parse and refresh it
+    csv_path = pathlib.Path(csv_path)
+    cache = csv_path.with_suffix('.feather')
+    if feather is not None and cache.exists() and cache.stat().st_mtime >= csv_path.stat().st_mtime:
+        return feather.read_feather(cache)
+    df = read_csv_frame(csv_path)
+    if feather is not None:
+        try:
+            feather.write_feather(df, cache, compression='zstd')
+        except OSError as e:
+            print(f'[warn] could not write {cache}: {e}', file=sys.stderr)
+    return df
+
+
+def load_frames(csv_paths):
+    # Several CSVs (e.g. one per sweep) are loaded concurrently and concatenated
+    if len(csv_paths) == 1:
+        return load_frame(csv_paths[0])
+    with ThreadPoolExecutor() as ex:
+        return pd.concat(list(ex.map(load_frame, csv_paths)), ignore_index=True)
+
+
+def read_csv_frame(csv_path):
+    # Nullable ints: empty cells become <NA> in compared columns and stay '' elsewhere
+    if pacsv is not None:
+        # Arrow's reader parses blocks on all cores
+        types = {k: pa.int64() for k in COMPARE_COLS}
+        types.update({k: pa.string() for k in TEXT_COLS})
+        table = pacsv.read_csv(csv_path, read_options=pacsv.ReadOptions(use_threads=True),
+                               convert_options=pacsv.ConvertOptions(column_types=types,
+                                                                    null_values=[""], strings_can_be_null=False))
+        return table.to_pandas(types_mapper={pa.int64(): pd.Int64Dtype()}.get)
+    dtype = {k: "Int64" for k in COMPARE_COLS}
+    dtype.update({k: str for k in TEXT_COLS})
+    return pd.read_csv(csv_path, dtype=dtype, keep_default_na=False, na_values={k: [""] for k in COMPARE_COLS})
+
+
+def frame_columns(df):
+    # Back to plain column lists with '' for missing cells, matching the csv module path
+    return {h: list(v) for h, v in df.astype(object).where(df.notna(), "").items()}
+
+
+def coerce_int(v):
+    # Only convert cells that look like ints; a str check is far cheaper than a try/except per cell
+    if v and (v.isdecimal() or (v[0] == '-' and v[1:].isdecimal())):
+        return int(v)
+    return v
+
+
+def stream_best(csv_paths):
+    # Fused load + best-row selection: keep only the running winner per group, so memory is
+    # O(#impl x #graph) rather than O(rows). Only the compared columns are parsed during the scan.
     best = {}
-    for r in rows:
-        key = (r.get('impl',''), r.get('lang',''), r.get('graph',''))
-        prev = best.get(key)
-        if prev is None:
-            best[key] = r
-        else:
-            p_new = int(r.get('popped') or 0)
-            p_old = int(prev.get('popped') or 0)
-            if p_new > p_old or (p_new == p_old and int(r.get('time_ns') or 1<<62) < int(prev.get('time_ns') or 1<<62)):
-                best[key] = r
-    return list(best.values())
-
-
-def format_md_table(rows):
+    headers = {}
+    for csv_path in csv_paths:
+        with open(csv_path, newline='', buffering=CSV_BUFFER) as f:
+            # csv.reader + fixed column offsets: no per-row dict as with DictReader
+            reader = csv.reader(f)
+            header = next(reader, [])
+            headers.update(dict.fromkeys(header))
+            width = len(header)
+            col = {h: i for i, h in enumerate(header)}
+            ii, il, ig, ip, it = (col.get(h, width) for h in ("impl", "lang", "graph", "popped", "time_ns"))
+            for row in reader:
+                if not row:
+                    continue
+                # pad ragged rows; the extra '' also serves absent columns (offset == width)
+                row += [''] * (width + 1 - len(row))
+                key = (sys.intern(row[ii]), sys.intern(row[il]), sys.intern(row[ig]))
+                # compared values are parsed once per row and kept with the winner, never re-parsed;
+                # a missing time_ns (None) never wins a tie
+                p = int(row[ip] or 0)
+                t = int(row[it]) if row[it] else None
+                prev = best.get(key)
+                if (prev is None or p > prev[0]
+                        or (p == prev[0] and t is not None and (prev[1] is None or t < prev[1]))):
+                    best[key] = (p, t, row, col)
+    # Columnar (SoA) result straight from the winning rows; int columns are coerced once, here
+    winners = list(best.values())
+    cols = {}
+    for h in headers:
+        vals = [row[col[h]] if h in col else '' for _, _, row, col in winners]
+        cols[h] = [coerce_int(v) for v in vals] if h in INT_COLS else vals
+    return cols
+
+
+def _argbest(gid, popped, tns, ngroups):
+    # compiled by _argbest_kernel; row index of each group's winner
+    best_pop = np.full(ngroups, -1, np.int64)
+    best_tns = np.full(ngroups, np.iinfo(np.int64).max, np.int64)
+    best_idx = np.full(ngroups, -1, np.int64)
+    for i in range(gid.size):
+        g = gid[i]
+        p = popped[i]
+        t = tns[i]
+        if p > best_pop[g] or (p == best_pop[g] and t < best_tns[g]):
+            best_pop[g] = p
+            best_tns[g] = t
+            best_idx[g] = i
+    return best_idx
+
+
+@lru_cache(maxsize=None)
+def _argbest_kernel():
+    # numba is imported only when a frame is big enough to use it; None when it is not installed
+    try:
+        from numba import njit
+    except Exception:
+        return None
+    return njit(cache=True)(_argbest)
+
+
+def best_frame(df):
+    # Same selection as stream_best. For big frames with numba, integer-encode the group key and
+    # run the compiled kernel; otherwise one stable sort + first row per group.
+    argbest = _argbest_kernel() if len(df) >= NUMBA_MIN_ROWS else None
+    if argbest is not None:
+        gid = np.zeros(len(df), dtype=np.int64)
+        for h in GROUP_COLS:
+            codes, uniques = pd.factorize(df[h])
+            gid = gid * (len(uniques) + 1) + codes.astype(np.int64)
+        _, first, dense = np.unique(gid, return_index=True, return_inverse=True)
+        popped = df["popped"].fillna(0).to_numpy(dtype=np.int64)
+        tns = df["time_ns"].fillna(1<<62).to_numpy(dtype=np.int64)
+        best_idx = argbest(dense.reshape(-1).astype(np.int64), popped, tns, first.size)
+        # np.unique numbers groups by key value; reorder them by first appearance like stream_best
+        return df.iloc[best_idx[np.argsort(first, kind="stable")]]
+    # _group numbers groups by first appearance, so winners come out in stream_best's order
+    ranked = df.assign(_popped=df["popped"].fillna(0), _group=df.groupby(list(GROUP_COLS), sort=False).ngroup()).sort_values(
+        ["_popped", "time_ns"], ascending=[False, True], na_position="last", kind="stable")
+    best = ranked.groupby(list(GROUP_COLS), sort=False).head(1).sort_values("_group", kind="stable")
+    return best.drop(columns=["_popped", "_group"])
+
+
+def format_md_table(cols):
+    # cols: a DataFrame, or a dict of column lists as returned by stream_best
     headers = ["impl","lang","graph","n","m","k","B","threads","time_ns","popped","edges_scanned","heap_pushes","B_prime","mem_bytes"]
-    lines = []
-    lines.append("| " + " | ".join(headers) + " |")
-    lines.append("|" + "---|"*len(headers))
-    for r in sorted(rows, key=lambda x: (x.get('graph',''), x.get('lang',''))):
-        vals = [str(r.get(h, '')) for h in headers]
-        lines.append("| " + " | ".join(vals) + " |")
-    return "\n".join(lines)
+    if pd is not None and isinstance(cols, pd.DataFrame):
+        df = cols.reindex(columns=headers).sort_values(["graph", "lang"], kind="stable")
+        if tabulate is not None:
+            return df.astype(object).where(df.notna(), "").to_markdown(index=False)
+        cols = frame_columns(df)
+    empty = [''] * len(next(iter(cols.values()), []))
+    table = sorted(zip(*[cols.get(h, empty) for h in headers]), key=itemgetter(headers.index('graph'), headers.index('lang')))
+    header = "| " + " | ".join(headers) + " |"
+    sep = "|" + "---|"*len(headers)
+    body = ["| " + " | ".join(map(str, r)) + " |" for r in table]
+    return "\n".join([header, sep, *body])
+
+
+def load_meta(meta_path):
+    # yaml is imported here so runs without --meta don't pay for it
+    meta_path = pathlib.Path(meta_path)
+    if not meta_path.is_file():
+        raise SystemExit(f'meta file not found: {meta_path}')
+    try:
+        import yaml
+    except ImportError:
+        print('[warn] PyYAML not installed; skipping environment section', file=sys.stderr)
+        return None
+    with open(meta_path) as f:
+        meta = yaml.safe_load(f)
+    if not isinstance(meta, dict):
+        raise SystemExit(f'meta file is not a mapping: {meta_path}')
+    return meta
 
 
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument('--csv', required=True)
+    ap.add_argument('--csv', required=True, nargs='+', help='one or more agg-*.csv files')
     ap.add_argument('--meta', required=False)
     ap.add_argument('--out', required=True, help='output directory')
     args = ap.parse_args()
 
     outdir = pathlib.Path(args.out)
     outdir.mkdir(parents=True, exist_ok=True)
-    rows = load_rows(args.csv)
-    summary = best_rows_by_impl(rows)
+    if pd is not None:
+        summary = best_frame(load_frames(args.csv))
+    else:
+        summary = stream_best(args.csv)
     md = ["# BMSSP 1000x Report",""]
-    if args.meta and yaml is not None:
-        try:
-            meta = yaml.safe_load(open(args.meta))
+    if args.meta:
+        meta = load_meta(args.meta)
+        if meta is not None:
             md.append("Environment:")
-            host = meta.get('host', {}) if isinstance(meta, dict) else {}
+            host = meta.get('host') or {}
             md.append(f"- Host: {host.get('system','')}/{host.get('release','')} ({host.get('machine','')})")
             md.append(f"- CPU cores: {meta.get('cpu_cores','')}")
             md.append(f"- Git commit: {meta.get('git_commit','')}")
             md.append("")
-        except Exception:
-            pass
     md.append("## Best rows per implementation (largest explored set)")
     md.append("")
     md.append(format_md_table(summary))
@@ -1,41 +1,73 @@
 #!/usr/bin/env python3
-import argparse, pathlib, csv
+import argparse, pathlib
+import matplotlib
+matplotlib.use('Agg')  # file output only; no GUI backend
 import matplotlib.pyplot as plt
+import numpy as np
 
-def load_csv(path):
-    rows=[]
-    with open(path) as f:
-        r = csv.DictReader(f)
-        for row in r:
-            row['time_ns'] = int(row['time_ns'])
-            row['popped'] = int(row['popped'])
-            rows.append(row)
-    return rows
-
-def plot_time_vs_popped(rows, outdir):
-    by_lang = {}
-    for r in rows:
-        key = (r['impl'], r['lang'])
-        by_lang.setdefault(key, []).append(r)
-    plt.figure(figsize=(6,4))
-    for (impl, lang), pts in by_lang.items():
-        pts = sorted(pts, key=lambda x: x['popped'])
-        xs = [p['popped'] for p in pts]
-        ys = [p['time_ns']/1e6 for p in pts]
-        plt.plot(xs, ys, marker='o', label=f"{lang} ({impl})")
-    plt.xlabel('|U| popped')
-    plt.ylabel('time (ms)')
-    plt.title('BMSSP time vs |U|')
-    plt.legend()
+from make_report import load_frames
+
+HEXBIN_MIN_POINTS = 100_000
+MAX_SERIES_POINTS = 800  # ~horizontal pixels of a 6in figure at 120 dpi
+
+matplotlib.rcParams.update({'path.simplify': True, 'path.simplify_threshold': 1.0, 'agg.path.chunksize': 10000})
+
+def load_csv(paths):
+    # shares make_report's parser and .feather sidecar cache
+    return load_frames(paths).astype({'time_ns': 'int64', 'popped': 'int64'})
+
+def downsample(xs, ys, npx=MAX_SERIES_POINTS):
+    # Bucket an x-sorted series into npx equal-width bins and keep the per-bin min/max of y,
+    # so the drawn envelope matches the full series. Returns (xs, ymax, ymin or None).
+    if len(xs) <= npx:
+        return xs, ys, None
+    bins = np.linspace(xs[0], xs[-1], npx + 1)
+    idx = np.clip(np.searchsorted(bins, xs, side='right') - 1, 0, npx - 1)
+    ymax = np.full(npx, -np.inf)
+    ymin = np.full(npx, np.inf)
+    np.maximum.at(ymax, idx, ys)
+    np.minimum.at(ymin, idx, ys)
+    keep = np.isfinite(ymax)
+    centers = (bins[:-1] + bins[1:]) / 2
+    return centers[keep], ymax[keep], ymin[keep]
+
+def reset_axes(ax):
+    # Reuse one figure across plots: clear the axes and drop extras such as colorbars
+    for other in ax.figure.axes:
+        if other is not ax:
+            other.remove()
+    ax.clear()
+    return ax.figure
+
+def plot_time_vs_popped(df, outdir, ax):
+    df = df.assign(ms=df['time_ns'] / 1e6)
+    fig = reset_axes(ax)
+    if len(df) > HEXBIN_MIN_POINTS:
+        # too many markers to draw one by one: aggregate into a density grid instead
+        hb = ax.hexbin(df['popped'].to_numpy(), df['ms'].to_numpy(), gridsize=200, bins='log', mincnt=1)
+        fig.colorbar(hb, ax=ax, label='rows')
+    else:
+        for (impl, lang), g in df.groupby(['impl', 'lang'], sort=False):
+            g = g.sort_values('popped', kind='stable')
+            xs, ys, ymin = downsample(g['popped'].to_numpy(), g['ms'].to_numpy())
+            line, = ax.plot(xs, ys, marker='o', markersize=3, linewidth=1, rasterized=True, label=f"{lang} ({impl})")
+            if ymin is not None:
+                ax.fill_between(xs, ymin, ys, color=line.get_color(), alpha=0.2, linewidth=0)
+        ax.legend()
+    ax.set_xlabel('|U| popped')
+    ax.set_ylabel('time (ms)')
+    ax.set_title('BMSSP time vs |U|')
     out = pathlib.Path(outdir)/'time_vs_popped.png'
-    plt.tight_layout()
-    plt.savefig(out)
+    fig.tight_layout()
+    fig.savefig(out, dpi=120)
     print(f'wrote {out}')
 
 if __name__ == '__main__':
     ap = argparse.ArgumentParser()
-    ap.add_argument('csv')
+    ap.add_argument('csv', nargs='+')
     ap.add_argument('--out', default='results')
     args = ap.parse_args()
-    rows = load_csv(args.csv)
-    plot_time_vs_popped(rows, args.out)
+    df = load_csv(args.csv)
+    fig, ax = plt.subplots(figsize=(6,4))
+    plot_time_vs_popped(df, args.out, ax)
+    plt.close(fig)
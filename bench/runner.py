@@ -1,10 +1,32 @@
 #!/usr/bin/env python3
-import argparse, subprocess, json, sys, csv, pathlib, shutil, hashlib, platform, os, random
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import argparse, subprocess, json, sys, csv, io, pathlib, shutil, hashlib, platform, os, random, re, signal, threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import partial
+from itertools import chain, product
 try:
     import yaml  # optional
+    # libyaml-backed C loader/dumper when PyYAML was built with it
+    YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    YamlDumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
 except Exception:
     yaml = None
+try:
+    import orjson  # optional: faster JSON parsing of implementation output and raw-*.jsonl writing
+    json_loads = orjson.loads
+    json_dumpb = orjson.dumps
+except Exception:
+    orjson = None
+    json_loads = json.loads
+    def json_dumpb(obj):
+        return json.dumps(obj).encode('utf-8')
+try:
+    import numpy as np  # optional: vectorized shared-input generation
+except Exception:
+    np = None
+try:
+    import msgpack  # optional: binary meta sidecar for --meta-msgpack
+except Exception:
+    msgpack = None
 try:
     from jsonschema import Draft202012Validator as SchemaValidator
 except Exception:
@@ -12,87 +34,148 @@ except Exception:
 from datetime import datetime, timezone
 
 ROOT = pathlib.Path(__file__).resolve().parents[1]
-
-
-def cfg_key_blob(graph_cfg, k, seed, maxw):
-    blob = json.dumps({'graph_cfg': graph_cfg, 'k': k, 'seed': seed, 'maxw': maxw}, sort_keys=True).encode('utf-8')
-    return hashlib.sha256(blob).hexdigest()[:16]
-
-
-def generate_shared_inputs(graph_cfg, k, seed, maxw, out_dir):
+# Bump when generate_shared_inputs output changes so cached shared-inputs/<key> dirs are not reused
+SHARED_INPUTS_VERSION = 2
+WRITE_BUFFER = 1 << 20  # shared inputs and result files reach many MB; keep write() syscalls few
+EDGE_BLOCK = 1 << 16  # edges formatted per bytes %-operation when writing graph.txt
+INTERN_FIELDS = ('impl', 'impl_', 'lang', 'graph')
+CSV_KEYS = ['impl', 'lang', 'graph', 'n', 'm', 'k', 'B', 'seed', 'threads', 'time_ns', 'popped', 'edges_scanned', 'heap_pushes', 'B_prime', 'mem_bytes']
+
+
+def cfg_key_blob(graph_cfg, k, seed, maxw, graph_json=None):
+    """Content key for a shared-inputs dir. graph_json: json.dumps(graph_cfg, sort_keys=True), if already
+    serialized. The blob is byte-identical to json.dumps of the whole key dict with sort_keys=True."""
+    if graph_json is None:
+        graph_json = json.dumps(graph_cfg, sort_keys=True)
+    blob = (f'{{"graph_cfg": {graph_json}, "k": {json.dumps(k)}, "maxw": {json.dumps(maxw)}, '
+            f'"seed": {json.dumps(seed)}, "version": {SHARED_INPUTS_VERSION}}}').encode('utf-8')
+    return hashlib.blake2b(blob, digest_size=8).hexdigest()
+
+
+def er_pair_indices(nrng, n, p):
+    """Sorted flat indices u*n+v of the n*n slots kept with probability p each.
+    Geometric gaps jump straight from one kept slot to the next (Batagelj-Brandes), so the
+    cost is O(n + m) rather than one random draw per pair.
+    """
+    total = n * n
+    if total == 0 or p <= 0:
+        return np.empty(0, dtype=np.int64)
+    if p >= 1:
+        return np.arange(total, dtype=np.int64)
+    chunks = []
+    pos = -1
+    while pos < total - 1:
+        left = (total - 1 - pos) * p
+        gaps = nrng.geometric(p, size=int(left + 4 * left ** 0.5 + 16))
+        idx = pos + np.cumsum(gaps)
+        chunks.append(idx[idx < total])
+        pos = int(idx[-1])
+    return np.concatenate(chunks)
+
+
+def ba_edges(nrng, n, m0, m_each, maxw):
+    """Barabasi-Albert edges as an (m, 3) array of (u, v, w), drawn without a per-edge Python loop.
+    Seed: directed clique on the first `start` nodes (weight 1), contributing each edge's source
+    to the preferential-attachment pool `ends`. Every later node u then attaches m_each edges to
+    targets drawn uniformly from the pool as it stood before u, and the pool grows by one
+    (target, u) pair per edge. Since that layout is fixed up front, all draws happen in one
+    call; a draw landing on an earlier edge's target slot copies that edge's target, resolved
+    by vectorized pointer jumping.
+    """
+    start = max(1, min(m0, n))
+    cu, cv = np.nonzero(~np.eye(start, dtype=bool))
+    seed_edges = np.column_stack([cu, cv, np.ones_like(cu)])
+    n_seed = cu.size
+    grow = max(0, n - start) * m_each
+    if grow == 0:
+        return seed_edges
+    e = np.arange(grow, dtype=np.int64)
+    src = start + e // m_each
+    pool = n_seed + 2 * m_each * (src - start)  # pool size seen by each edge's node
+    empty = pool == 0  # only when the seed clique has no edges: attach to node 0
+    r = nrng.integers(0, np.maximum(pool, 1))
+    tgt = np.zeros(grow, dtype=np.int64)
+    ref = np.full(grow, -1, dtype=np.int64)  # >= 0: copy the target of edge ref
+    seeded = ~empty & (r < n_seed)
+    tgt[seeded] = cu[r[seeded]]
+    off = r - n_seed
+    grown = ~empty & ~seeded
+    is_src = grown & (off % 2 == 1)
+    tgt[is_src] = start + (off[is_src] // 2) // m_each
+    is_tgt = grown & ~is_src
+    ref[is_tgt] = off[is_tgt] // 2
+    pend = np.flatnonzero(is_tgt)
+    while pend.size:
+        nxt = ref[pend]
+        jump = ref[nxt]
+        done = jump < 0
+        tgt[pend[done]] = tgt[nxt[done]]
+        ref[pend[done]] = -1
+        keep = ~done
+        ref[pend[keep]] = jump[keep]
+        pend = pend[keep]
+    ws = nrng.integers(1, maxw + 1, size=grow, dtype=np.int64)
+    return np.concatenate([seed_edges, np.column_stack([src, tgt, ws])])
+
+
+def generate_shared_inputs(graph_cfg, k, seed, maxw, out_dir, key=None):
     """Generate canonical graph+sources files to ensure identical inputs across languages.
     Format:
       graph.txt: first line 'n m', followed by m lines 'u v w' (directed edges)
       sources.txt: first line 'k', followed by k lines 'u d0'
-    Returns paths (graph_path, sources_path).
+    Returns paths (graph_path, sources_path). key: precomputed cfg_key_blob, if any.
     """
     g = graph_cfg
-    key = cfg_key_blob(graph_cfg, k, seed, maxw)
+    if key is None:
+        key = cfg_key_blob(graph_cfg, k, seed, maxw)
     idir = pathlib.Path(out_dir) / 'shared-inputs' / key
     graph_path = idir / 'graph.txt'
     src_path = idir / 'sources.txt'
     if graph_path.exists() and src_path.exists():
         return graph_path, src_path
+    if np is None:
+        raise SystemExit('--shared-inputs requires numpy (pip install -r bench/requirements.txt)')
     idir.mkdir(parents=True, exist_ok=True)
 
-    rng = random.Random(seed)
+    nrng = np.random.default_rng(seed)
     edges = []
     n = 0
     gtype = g['type']
     if gtype == 'grid':
         rows, cols = int(g['rows']), int(g['cols'])
         n = rows * cols
-        def idx(r,c):
-            return r * cols + c
-        for r in range(rows):
-            for c in range(cols):
-                u = idx(r,c)
-                # down, right, up, left (directed, so both ways across iterations)
-                if r + 1 < rows:
-                    edges.append((u, idx(r+1,c), rng.randint(1, maxw)))
-                if c + 1 < cols:
-                    edges.append((u, idx(r, c+1), rng.randint(1, maxw)))
-                if r - 1 >= 0:
-                    edges.append((u, idx(r-1,c), rng.randint(1, maxw)))
-                if c - 1 >= 0:
-                    edges.append((u, idx(r, c-1), rng.randint(1, maxw)))
+        rr, cc = np.meshgrid(np.arange(rows), np.arange(cols), indexing='ij')
+        u = rr * cols + cc
+        # down, right, up, left per cell (directed, so both ways across cells); boolean
+        # indexing walks (r, c, dir) in C order, matching the old nested loops
+        v = np.stack([u + cols, u + 1, u - cols, u - 1], axis=-1)
+        ok = np.stack([rr + 1 < rows, cc + 1 < cols, rr >= 1, cc >= 1], axis=-1)
+        us = np.broadcast_to(u[..., None], v.shape)[ok]
+        vs = v[ok]
+        ws = nrng.integers(1, maxw + 1, size=vs.size, dtype=np.int64)
+        edges = np.column_stack([us, vs, ws])
     elif gtype == 'er':
         n = int(g['n'])
         p = float(g['p'])
         if n > 200_000 and p * n > 10:
-            print(f"[warn] ER graph with n={n} and p={p} will be extremely dense/heavy to generate (O(n^2)); consider BA/grid instead.", file=sys.stderr)
-        for u in range(n):
-            for v in range(n):
-                if u == v: continue
-                if rng.random() < p:
-                    edges.append((u, v, rng.randint(1, maxw)))
+            print(f"[warn] ER graph with n={n} and p={p} will have ~{int(p * n * n)} edges; consider BA/grid instead.", file=sys.stderr)
+        idx = er_pair_indices(nrng, n, p)
+        idx = idx[idx % (n + 1) != 0]  # drop self-loops (u == v)
+        ws = nrng.integers(1, maxw + 1, size=idx.size, dtype=np.int64)
+        edges = np.column_stack([idx // n, idx % n, ws])
     elif gtype == 'ba':
         n = int(g['n'])
-        m0 = int(g.get('m0', 5))
-        m_each = int(g.get('m', 5))
-        ends = []
-        start = max(1, min(m0, n))
-        for u in range(start):
-            for v in range(start):
-                if u == v: continue
-                edges.append((u, v, 1))
-                ends.append(u)
-        for u in range(start, n):
-            for _ in range(m_each):
-                if len(ends) == 0:
-                    t = rng.randrange(0 if u == 0 else u or 1)
-                else:
-                    t = ends[rng.randrange(len(ends))]
-                edges.append((u, t, rng.randint(1, maxw)))
-                ends.append(t); ends.append(u)
+        edges = ba_edges(nrng, n, int(g.get('m0', 5)), int(g.get('m', 5)), maxw)
     else:
         raise SystemExit(f'unsupported graph type for shared inputs: {gtype}')
-
-    # write graph
-    with open(graph_path, 'w') as f:
-        f.write(f"{n} {len(edges)}\n")
-        for (u,v,w) in edges:
-            f.write(f"{u} {v} {w}\n")
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 3)
+
+    # write graph: header 'n m' then one 'u v w' row per edge, formatted a block of rows at a time
+    with open(graph_path, 'wb', buffering=WRITE_BUFFER) as f:
+        f.write(f"{n} {len(edges)}\n".encode())
+        for i in range(0, len(edges), EDGE_BLOCK):
+            block = edges[i:i + EDGE_BLOCK]
+            f.write((b'%d %d %d\n' * len(block)) % tuple(block.ravel().tolist()))
     # sources: distinct k nodes, d0=0
     k_eff = int(k)
     chosen = set()
@@ -103,46 +186,172 @@ def generate_shared_inputs(graph_cfg, k, seed, maxw, out_dir):
         if s not in chosen:
             chosen.add(s)
             srcs.append((s, 0))
-    with open(src_path, 'w') as f:
-        f.write(f"{len(srcs)}\n")
-        for (s,d0) in srcs:
-            f.write(f"{s} {d0}\n")
+    with open(src_path, 'wb', buffering=WRITE_BUFFER) as f:
+        f.write(f"{len(srcs)}\n".encode() + b''.join(b'%d %d\n' % sd for sd in srcs))
     return graph_path, src_path
 
 
-def run_rust(graph_cfg, B, k, trials, seed, maxw, threads, bin_path, timeout_s=0, shared_inputs=None):
-    args = [str(bin_path), '--json', '--trials', str(trials), '--k', str(k), '--B', str(B), '--seed', str(seed), '--maxw', str(maxw), '--threads', str(threads)]
+def _gen(a):
+    """Process-pool entry point: a = (graph_cfg, k, seed, maxw, out_dir, key)."""
+    return generate_shared_inputs(*a)
+
+
+def _kill_group(p):
+    """SIGKILL the process group of p, a run_jsonl child (just p where there are no process groups)."""
+    try:
+        if hasattr(os, 'killpg'):
+            os.killpg(p.pid, signal.SIGKILL)
+        else:
+            p.kill()
+    except ProcessLookupError:
+        pass
+
+
+def run_jsonl(args, timeout_s=0, procs=None):
+    """Run an implementation and parse its JSONL stdout line by line as it is produced.
+    Raises subprocess.TimeoutExpired / CalledProcessError like subprocess.run(check=True).
+    procs: optional set that holds the Popen while it runs, so the caller can kill it on Ctrl-C.
+    """
+    # POSIX: own session, so a timeout kills the whole group and nothing left holds stdout open.
+    # The group no longer gets the terminal's Ctrl-C either; see procs.
+    with subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=1 << 16,
+                          start_new_session=hasattr(os, 'killpg')) as p:
+        if procs is not None:
+            procs.add(p)
+        timed_out = threading.Event()
+        def kill():
+            timed_out.set()
+            _kill_group(p)
+        timer = threading.Timer(timeout_s, kill) if timeout_s else None
+        if timer is not None:
+            timer.start()
+        try:
+            rows = []
+            try:
+                rows = [json_loads(line) for line in p.stdout if line.strip()]
+            except ValueError:
+                # a killed child can leave a truncated last line
+                if not timed_out.is_set():
+                    raise
+            # the timer stays armed here: a child may close stdout and keep running
+            rc = p.wait()
+        except KeyboardInterrupt:
+            _kill_group(p)
+            raise
+        finally:
+            if timer is not None:
+                timer.cancel()
+            if procs is not None:
+                procs.discard(p)
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(args, timeout_s)
+    if rc != 0:
+        raise subprocess.CalledProcessError(rc, args)
+    return rows
+
+
+def pin_cpus(args, ncpus):
+    """Prefix args with taskset so the child (and its threads) stay on the first ncpus allowed CPUs.
+    Linux only; returns args unchanged elsewhere or when taskset is unavailable."""
+    if not sys.platform.startswith('linux') or not shutil.which('taskset'):
+        return args
+    cpus = sorted(os.sched_getaffinity(0))[:max(1, ncpus)]
+    return ['taskset', '-c', ','.join(map(str, cpus))] + args
+
+
+GRAPH_TYPES = ('grid', 'er', 'ba')
+# graph type -> (flag, graph_cfg key, default or None when required)
+GRAPH_ARGS = {
+    'grid': (('--rows', 'rows', None), ('--cols', 'cols', None)),
+    'er': (('--n', 'n', None), ('--p', 'p', None)),
+    'ba': (('--n', 'n', None), ('--m0', 'm0', 5), ('--m', 'm', 5)),
+}
+# Per-impl CLI conventions for run_impl:
+#   cmd(bin_path) -> argv prefix; graphs: supported generated graph types;
+#   shared: accepts --graph-file/--sources-file; threads: accepts --threads (runs pinned to that many CPUs);
+#   tolerate_failure: a non-zero exit is warned about and skipped instead of failing the task
+SPECS = {
+    'rust': {'name': 'rust', 'cmd': lambda b: [str(b), '--json'], 'graphs': GRAPH_TYPES, 'shared': True, 'threads': True},
+    # Crystal: no shared-input or BA support yet
+    'crystal': {'name': 'crystal', 'cmd': lambda b: [str(b), '--json'], 'graphs': ('grid', 'er')},
+    'c': {'name': 'c', 'cmd': lambda b: [str(b)], 'graphs': GRAPH_TYPES, 'shared': True},
+    'cpp': {'name': 'c++', 'cmd': lambda b: [str(b)], 'graphs': GRAPH_TYPES, 'shared': True},
+    'kotlin': {'name': 'kotlin', 'cmd': lambda b: ['java', '-jar', str(b), '--json'], 'graphs': GRAPH_TYPES},
+    'elixir': {'name': 'elixir', 'cmd': lambda b: ['elixir', str(b)], 'graphs': ('grid', 'er'), 'tolerate_failure': True},
+    'erlang': {'name': 'erlang', 'cmd': lambda b: ['erl', '-noshell', '-pa', str(b.parent), '-s', 'bmssp', 'main', '-s', 'init', 'stop', '-extra'],
+               'graphs': ('grid', 'er'), 'tolerate_failure': True},
+    'nim': {'name': 'nim', 'cmd': lambda b: [str(b)], 'graphs': GRAPH_TYPES},
+}
+
+
+def run_impl(spec, bin_path, graph_cfg, B, k, trials, seed, maxw, timeout_s=0, shared_inputs=None, threads=1, procs=None):
+    """Run one implementation described by a SPECS entry and return its JSONL rows tagged with graph_cfg.
+    procs: passed on to run_jsonl."""
+    name = spec['name']
     gtype = graph_cfg['type']
+    if gtype not in GRAPH_ARGS:
+        # no impl knows it; generate_shared_inputs is where an unknown type is a hard error
+        print(f'[warn] unsupported graph type "{gtype}" for {name}; skipping', file=sys.stderr)
+        return []
+    if not spec.get('shared'):
+        shared_inputs = None
+    if shared_inputs is None and gtype not in spec['graphs']:
+        # Gracefully skip unsupported graph types to avoid aborting smoke runs.
+        print(f'[info] {name} impl does not support graph type "{gtype}" yet; skipping', file=sys.stderr)
+        return []
+    args = spec['cmd'](bin_path) + ['--trials', str(trials), '--k', str(k), '--B', str(B), '--seed', str(seed), '--maxw', str(maxw)]
+    if spec.get('threads'):
+        args += ['--threads', str(threads)]
+    args += ['--graph', gtype]
     if shared_inputs is not None:
         graph_path, src_path = shared_inputs
-        args += ['--graph', gtype, '--graph-file', str(graph_path), '--sources-file', str(src_path)]
+        args += ['--graph-file', str(graph_path), '--sources-file', str(src_path)]
     else:
-        args += ['--graph', gtype]
-        if gtype == 'grid':
-            args += ['--rows', str(graph_cfg['rows']), '--cols', str(graph_cfg['cols'])]
-        elif gtype == 'er':
-            args += ['--n', str(graph_cfg['n']), '--p', str(graph_cfg['p'])]
-        elif gtype == 'ba':
-            args += ['--n', str(graph_cfg['n']), '--m0', str(graph_cfg.get('m0',5)), '--m', str(graph_cfg.get('m',5))]
-        else:
-            raise SystemExit(f'unsupported graph type: {gtype}')
-
+        for flag, key, default in GRAPH_ARGS[gtype]:
+            args += [flag, str(graph_cfg[key] if default is None else graph_cfg.get(key, default))]
     try:
-        p = subprocess.run(args, check=True, capture_output=True, text=True, timeout=(timeout_s or None))
+        if spec.get('threads'):
+            args = pin_cpus(args, threads)
+        rows = run_jsonl(args, timeout_s, procs)
     except subprocess.TimeoutExpired:
-        print(f'[warn] rust run timed out: {args}', file=sys.stderr)
+        print(f'[warn] {name} run timed out: {args}', file=sys.stderr)
+        return []
+    except subprocess.CalledProcessError as e:
+        if not spec.get('tolerate_failure'):
+            raise
+        print(f'[warn] {name} run failed (exit {e.returncode}); skipping: {args}', file=sys.stderr)
         return []
-    rows = [json.loads(line) for line in p.stdout.splitlines() if line.strip()]
     for r in rows:
         r['graph_cfg'] = graph_cfg
     return rows
 
+
+run_rust = partial(run_impl, SPECS['rust'])
+run_crystal = partial(run_impl, SPECS['crystal'])
+run_c = partial(run_impl, SPECS['c'])
+run_cpp = partial(run_impl, SPECS['cpp'])
+run_kotlin = partial(run_impl, SPECS['kotlin'])
+run_elixir = partial(run_impl, SPECS['elixir'])
+run_erlang = partial(run_impl, SPECS['erlang'])
+run_nim = partial(run_impl, SPECS['nim'])
+
+def _needs_rebuild(bin_path, src_dir, src_globs):
+    """True unless bin_path exists and is newer than every file matching src_globs under src_dir.
+    BMSSP_FORCE_REBUILD=1 always rebuilds."""
+    if os.environ.get('BMSSP_FORCE_REBUILD') == '1' or not bin_path.exists():
+        return True
+    srcs = [p for p in chain.from_iterable(src_dir.glob(g) for g in src_globs) if p.is_file()]
+    if not srcs:
+        return True
+    return bin_path.stat().st_mtime <= max(p.stat().st_mtime for p in srcs)
+
 def build_crystal(root):
     crdir = root / 'impls' / 'crystal'
     # Prefer building if toolchain exists; otherwise fall back to prebuilt binary if present.
     bin_path = crdir / 'bin' / 'bmssp_cr'
     if shutil.which('crystal') and shutil.which('shards'):
-        subprocess.run(['shards', 'build', '--release'], cwd=crdir, check=True)
+        if _needs_rebuild(bin_path, crdir, ('src/**/*.cr', 'shard.yml')):
+            subprocess.run(['shards', 'build', '--release'], cwd=crdir, check=True)
         return bin_path
     # Fallback: use existing binary if available
     if bin_path.exists() and os.access(bin_path, os.X_OK):
@@ -151,93 +360,25 @@ def build_crystal(root):
     print('[warn] Crystal toolchain not found and no prebuilt binary present; skipping Crystal', file=sys.stderr)
     return None
 
-def run_crystal(bin_path, graph_cfg, B, k, trials, seed, maxw, timeout_s=0):
-    args = [str(bin_path), '--json', '--trials', str(trials), '--k', str(k), '--B', str(B), '--seed', str(seed), '--maxw', str(maxw)]
-    gtype = graph_cfg['type']
-    args += ['--graph', gtype]
-    if gtype == 'grid':
-        args += ['--rows', str(graph_cfg['rows']), '--cols', str(graph_cfg['cols'])]
-    elif gtype == 'er':
-        args += ['--n', str(graph_cfg['n']), '--p', str(graph_cfg['p'])]
-    else:
-        # Gracefully skip unsupported graph types for Crystal to avoid aborting smoke runs.
-        print(f'[info] Crystal impl does not support graph type "{gtype}" yet; skipping', file=sys.stderr)
-        return []
-    try:
-        p = subprocess.run(args, check=True, capture_output=True, text=True, timeout=(timeout_s or None))
-    except subprocess.TimeoutExpired:
-        print(f'[warn] crystal run timed out: {args}', file=sys.stderr)
-        return []
-    rows = [json.loads(line) for line in p.stdout.splitlines() if line.strip()]
-    for r in rows:
-        r['graph_cfg'] = graph_cfg
-    return rows
-
 def build_c(root):
     cdir = root / 'impls' / 'c'
     if not shutil.which('cc') and not shutil.which('gcc'):
         print('[warn] C compiler not found in PATH; skipping', file=sys.stderr)
         return None
-    subprocess.run(['make'], cwd=cdir, check=True)
-    return cdir / 'bmssp_c'
-
-def run_c(bin_path, graph_cfg, B, k, trials, seed, maxw, timeout_s=0, shared_inputs=None):
-    gtype = graph_cfg['type']
-    args = [str(bin_path), '--k', str(k), '--B', str(B), '--seed', str(seed), '--trials', str(trials), '--maxw', str(maxw)]
-    if shared_inputs is not None:
-        graph_path, src_path = shared_inputs
-        args += ['--graph', gtype, '--graph-file', str(graph_path), '--sources-file', str(src_path)]
-    else:
-        if gtype == 'grid':
-            args += ['--graph','grid','--rows', str(graph_cfg['rows']), '--cols', str(graph_cfg['cols'])]
-        elif gtype == 'er':
-            args += ['--graph','er','--n', str(graph_cfg['n']), '--p', str(graph_cfg['p'])]
-        elif gtype == 'ba':
-            args += ['--graph','ba','--n', str(graph_cfg['n']), '--m0', str(graph_cfg.get('m0',5)), '--m', str(graph_cfg.get('m',5))]
-        else:
-            return []
-    try:
-        p = subprocess.run(args, check=True, capture_output=True, text=True, timeout=(timeout_s or None))
-    except subprocess.TimeoutExpired:
-        print(f'[warn] c run timed out: {args}', file=sys.stderr)
-        return []
-    rows = [json.loads(line) for line in p.stdout.splitlines() if line.strip()]
-    for r in rows:
-        r['graph_cfg'] = graph_cfg
-    return rows
+    bin_path = cdir / 'bmssp_c'
+    if _needs_rebuild(bin_path, cdir, ('src/**/*.c', 'src/**/*.h', 'Makefile')):
+        subprocess.run(['make'], cwd=cdir, check=True)
+    return bin_path
 
 def build_cpp(root):
     d = root / 'impls' / 'cpp'
     if not shutil.which('c++') and not shutil.which('g++') and not shutil.which('clang++'):
         print('[warn] C++ compiler not found in PATH; skipping', file=sys.stderr)
         return None
-    subprocess.run(['make'], cwd=d, check=True)
-    return d / 'bmssp_cpp'
-
-def run_cpp(bin_path, graph_cfg, B, k, trials, seed, maxw, timeout_s=0, shared_inputs=None):
-    gtype = graph_cfg['type']
-    args = [str(bin_path), '--k', str(k), '--B', str(B), '--seed', str(seed), '--trials', str(trials), '--maxw', str(maxw)]
-    if shared_inputs is not None:
-        graph_path, src_path = shared_inputs
-        args += ['--graph', gtype, '--graph-file', str(graph_path), '--sources-file', str(src_path)]
-    else:
-        if gtype == 'grid':
-            args += ['--graph','grid','--rows', str(graph_cfg['rows']), '--cols', str(graph_cfg['cols'])]
-        elif gtype == 'er':
-            args += ['--graph','er','--n', str(graph_cfg['n']), '--p', str(graph_cfg['p'])]
-        elif gtype == 'ba':
-            args += ['--graph','ba','--n', str(graph_cfg['n']), '--m0', str(graph_cfg.get('m0',5)), '--m', str(graph_cfg.get('m',5))]
-        else:
-            return []
-    try:
-        p = subprocess.run(args, check=True, capture_output=True, text=True, timeout=(timeout_s or None))
-    except subprocess.TimeoutExpired:
-        print(f'[warn] c++ run timed out: {args}', file=sys.stderr)
-        return []
-    rows = [json.loads(line) for line in p.stdout.splitlines() if line.strip()]
-    for r in rows:
-        r['graph_cfg'] = graph_cfg
-    return rows
+    bin_path = d / 'bmssp_cpp'
+    if _needs_rebuild(bin_path, d, ('src/**/*.cpp', 'src/**/*.h', 'src/**/*.hpp', 'Makefile')):
+        subprocess.run(['make'], cwd=d, check=True)
+    return bin_path
 
 def build_kotlin(root):
     kdir = root / 'impls' / 'kotlin'
@@ -257,30 +398,10 @@ def build_kotlin(root):
         return None
     out = kdir / 'bmssp_kotlin.jar'
     src = kdir / 'src' / 'main' / 'kotlin' / 'Main.kt'
-    subprocess.run([kotlinc, str(src), '-include-runtime', '-d', str(out)], cwd=kdir, check=True)
+    if _needs_rebuild(out, kdir, ('src/**/*.kt',)):
+        subprocess.run([kotlinc, str(src), '-include-runtime', '-d', str(out)], cwd=kdir, check=True)
     return out
 
-def run_kotlin(jar_path, graph_cfg, B, k, trials, seed, maxw, timeout_s=0):
-    gtype = graph_cfg['type']
-    args = ['java', '-jar', str(jar_path), '--json', '--trials', str(trials), '--k', str(k), '--B', str(B), '--seed', str(seed), '--maxw', str(maxw), '--graph', gtype]
-    if gtype == 'grid':
-        args += ['--rows', str(graph_cfg['rows']), '--cols', str(graph_cfg['cols'])]
-    elif gtype == 'er':
-        args += ['--n', str(graph_cfg['n']), '--p', str(graph_cfg['p'])]
-    elif gtype == 'ba':
-        args += ['--n', str(graph_cfg['n']), '--m0', str(graph_cfg.get('m0',5)), '--m', str(graph_cfg.get('m',5))]
-    else:
-        return []
-    try:
-        p = subprocess.run(args, check=True, capture_output=True, text=True, timeout=(timeout_s or None))
-    except subprocess.TimeoutExpired:
-        print(f'[warn] kotlin run timed out: {args}', file=sys.stderr)
-        return []
-    rows = [json.loads(line) for line in p.stdout.splitlines() if line.strip()]
-    for r in rows:
-        r['graph_cfg'] = graph_cfg
-    return rows
-
 def build_elixir(root):
     edir = root / 'impls' / 'elixir'
     if not shutil.which('elixir'):
@@ -289,99 +410,25 @@ def build_elixir(root):
     # no build needed for .exs
     return edir / 'bmssp.exs'
 
-def run_elixir(exs_path, graph_cfg, B, k, trials, seed, maxw, timeout_s=0):
-    gtype = graph_cfg['type']
-    if gtype == 'ba':
-        # Elixir implementation currently lacks BA support; skip to avoid hard failures
-        print(f"[info] Elixir impl does not support graph type \"{gtype}\" yet; skipping", file=sys.stderr)
-        return []
-    args = ['elixir', str(exs_path), '--trials', str(trials), '--k', str(k), '--B', str(B), '--seed', str(seed), '--maxw', str(maxw), '--graph', gtype]
-    if gtype == 'grid':
-        args += ['--rows', str(graph_cfg['rows']), '--cols', str(graph_cfg['cols'])]
-    elif gtype == 'er':
-        args += ['--n', str(graph_cfg['n']), '--p', str(graph_cfg['p'])]
-    elif gtype == 'ba':
-        # See above early return; keep branch for completeness if support is added later
-        args += ['--n', str(graph_cfg['n']), '--m0', str(graph_cfg.get('m0',5)), '--m', str(graph_cfg.get('m',5))]
-    else:
-        return []
-    try:
-        p = subprocess.run(args, check=True, capture_output=True, text=True, timeout=(timeout_s or None))
-    except subprocess.TimeoutExpired:
-        print(f'[warn] elixir run timed out: {args}', file=sys.stderr)
-        return []
-    except subprocess.CalledProcessError as e:
-        print(f'[warn] elixir run failed (exit {e.returncode}); skipping: {args}', file=sys.stderr)
-        return []
-    rows = [json.loads(line) for line in p.stdout.splitlines() if line.strip()]
-    for r in rows:
-        r['graph_cfg'] = graph_cfg
-    return rows
-
 def build_erlang(root):
     edir = root / 'impls' / 'erlang'
     if not shutil.which('erlc'):
         print('[warn] erlang compiler (erlc) not found; skipping', file=sys.stderr)
         return None
-    subprocess.run(['erlc', 'bmssp.erl'], cwd=edir, check=True)
-    return edir / 'bmssp.beam'
-
-def run_erlang(beam_path, graph_cfg, B, k, trials, seed, maxw, timeout_s=0):
-    gtype = graph_cfg['type']
-    if gtype == 'ba':
-        print(f"[info] Erlang impl does not support graph type \"{gtype}\" yet; skipping", file=sys.stderr)
-        return []
-    args = ['erl', '-noshell', '-pa', str(beam_path.parent), '-s', 'bmssp', 'main', '-s', 'init', 'stop', '-extra', '--trials', str(trials), '--k', str(k), '--B', str(B), '--seed', str(seed), '--maxw', str(maxw), '--graph', gtype]
-    if gtype == 'grid':
-        args += ['--rows', str(graph_cfg['rows']), '--cols', str(graph_cfg['cols'])]
-    elif gtype == 'er':
-        args += ['--n', str(graph_cfg['n']), '--p', str(graph_cfg['p'])]
-    elif gtype == 'ba':
-        args += ['--n', str(graph_cfg['n']), '--m0', str(graph_cfg.get('m0',5)), '--m', str(graph_cfg.get('m',5))]
-    else:
-        return []
-    try:
-        p = subprocess.run(args, check=True, capture_output=True, text=True, timeout=(timeout_s or None))
-    except subprocess.TimeoutExpired:
-        print(f'[warn] erlang run timed out: {args}', file=sys.stderr)
-        return []
-    except subprocess.CalledProcessError as e:
-        print(f'[warn] erlang run failed (exit {e.returncode}); skipping: {args}', file=sys.stderr)
-        return []
-    rows = [json.loads(line) for line in p.stdout.splitlines() if line.strip()]
-    for r in rows:
-        r['graph_cfg'] = graph_cfg
-    return rows
+    beam_path = edir / 'bmssp.beam'
+    if _needs_rebuild(beam_path, edir, ('bmssp.erl',)):
+        subprocess.run(['erlc', 'bmssp.erl'], cwd=edir, check=True)
+    return beam_path
 
 def build_nim(root):
     ndir = root / 'impls' / 'nim'
     if not shutil.which('nim'):
         print('[warn] Nim compiler not found in PATH; skipping', file=sys.stderr)
         return None
-    subprocess.run(['nim', 'c', '-d:release', '--out:bmssp_nim', 'src/main.nim'], cwd=ndir, check=True)
-    return ndir / 'bmssp_nim'
-
-def run_nim(bin_path, graph_cfg, B, k, trials, seed, maxw, timeout_s=0):
-    gtype = graph_cfg['type']
-    args = [str(bin_path), '--k', str(k), '--B', str(B), '--seed', str(seed), '--trials', str(trials), '--maxw', str(maxw)]
-    if gtype == 'grid':
-        args += ['--graph','grid','--rows', str(graph_cfg['rows']), '--cols', str(graph_cfg['cols'])]
-    elif gtype == 'er':
-        args += ['--graph','er','--n', str(graph_cfg['n']), '--p', str(graph_cfg['p'])]
-    elif gtype == 'ba':
-        args += ['--graph','ba','--n', str(graph_cfg['n']), '--m0', str(graph_cfg.get('m0',5)), '--m', str(graph_cfg.get('m',5))]
-    else:
-        return []
-    try:
-        p = subprocess.run(args, check=True, capture_output=True, text=True, timeout=(timeout_s or None))
-    except subprocess.TimeoutExpired:
-        print(f'[warn] nim run timed out: {args}', file=sys.stderr)
-        return []
-    rows = [json.loads(line) for line in p.stdout.splitlines() if line.strip()]
-    for r in rows:
-        r['graph_cfg'] = graph_cfg
-    return rows
-
+    bin_path = ndir / 'bmssp_nim'
+    if _needs_rebuild(bin_path, ndir, ('src/**/*.nim',)):
+        subprocess.run(['nim', 'c', '-d:release', '--out:bmssp_nim', 'src/main.nim'], cwd=ndir, check=True)
+    return bin_path
 
 def default_cfg():
     return {
@@ -398,6 +445,192 @@ def default_cfg():
         'threads': [1],
     }
 
+
+def write_atomic(path, data):
+    """Write data (str or bytes) to path via a sibling .tmp file, fsync once and os.replace, so
+    readers never see a half-written file; the temp file is removed if anything fails."""
+    tmp = path.with_suffix(path.suffix + '.tmp')
+    try:
+        with open(tmp, 'wb' if isinstance(data, bytes) else 'w', buffering=WRITE_BUFFER) as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+_CSV_LINE = (','.join('{%s}' % k for k in CSV_KEYS) + '\r\n').format_map
+
+
+class _CsvRow(dict):
+    """Read-only CSV view of a row: absent keys render empty, as csv.writer renders None."""
+    __slots__ = ()
+
+    def __missing__(self, key):
+        # Normalize impl key (some emit 'impl' already; Rust uses serde rename)
+        if key == 'impl':
+            return self.get('impl_', '')
+        return ''
+
+
+def _csv_lines(rows):
+    """agg CSV lines for rows, identical to csv.writer output. Rows are formatted with one format
+    string; the rare line that would need quoting or holds a None is redone with csv.writer."""
+    seps = len(CSV_KEYS) - 1
+    slow = io.StringIO()
+    w = csv.writer(slow)
+    lines = []
+    for r in rows:
+        row = _CsvRow(r)
+        line = _CSV_LINE(row)
+        if line.count(',') != seps or line.count('\n') != 1 or line.count('\r') != 1 or '"' in line or 'None' in line:
+            slow.seek(0)
+            slow.truncate()
+            w.writerow([row[k] for k in CSV_KEYS])
+            line = slow.getvalue()
+        lines.append(line)
+    return lines
+
+
+def _write_jsonl(rows, path):
+    with open(path, 'wb', buffering=WRITE_BUFFER) as f:
+        f.writelines(json_dumpb(r) + b'\n' for r in rows)
+
+
+def _write_csv(rows, path):
+    with open(path, 'w', newline='', buffering=WRITE_BUFFER) as f:
+        csv.writer(f).writerow(CSV_KEYS)
+        f.writelines(_csv_lines(rows))
+
+
+def _dump(all_rows, out_dir, stamp):
+    """Write raw-<stamp>.jsonl and agg-<stamp>.csv side by side; returns their paths.
+    Neither writer mutates rows, so both can read all_rows at once."""
+    jsonl = out_dir / f'raw-{stamp}.jsonl'
+    csv_path = out_dir / f'agg-{stamp}.csv'
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        futs = [ex.submit(_write_jsonl, all_rows, jsonl), ex.submit(_write_csv, all_rows, csv_path)]
+        for fut in futs:
+            fut.result()
+    return jsonl, csv_path
+
+
+_YAML_PLAIN = re.compile(r'[A-Za-z_][A-Za-z0-9_.-]*\Z')
+_YAML_RESERVED = {'yes', 'no', 'true', 'false', 'on', 'off', 'null'}
+
+
+def _yaml_scalar(v):
+    if v is None:
+        return 'null'
+    if isinstance(v, bool):
+        return 'true' if v else 'false'
+    if isinstance(v, int):
+        return str(v)
+    if isinstance(v, float):
+        if v != v:
+            return '.nan'
+        if v in (float('inf'), float('-inf')):
+            return '.inf' if v > 0 else '-.inf'
+        r = repr(v)
+        # YAML 1.1 floats need a '.', or 5e-05 loads back as a string (as SafeRepresenter does)
+        if '.' not in r and 'e' in r:
+            r = r.replace('e', '.0e')
+        return r
+    if isinstance(v, str):
+        if _YAML_PLAIN.match(v) and v.lower() not in _YAML_RESERVED:
+            return v
+        if not v.isascii():
+            # json.dumps writes chars beyond U+FFFF as surrogate pairs, which YAML reads back as two chars
+            raise TypeError('non-ASCII strings are left to PyYAML')
+        return json.dumps(v)  # a JSON string is a valid double-quoted YAML scalar
+    raise TypeError(f'cannot emit {type(v).__name__} as YAML')
+
+
+def _yaml_value(v):
+    if isinstance(v, dict):
+        return '{}'
+    if isinstance(v, (list, tuple)):
+        return '[]'
+    return _yaml_scalar(v)
+
+
+def _fast_yaml_dump(obj, buf, indent=''):
+    """Append block-style YAML for nested dicts/lists of scalars to buf (a list of str).
+    Raises TypeError on anything else so callers can fall back to PyYAML."""
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            key = _yaml_scalar(k)
+            if isinstance(v, dict) and v:
+                buf.append(f'{indent}{key}:\n')
+                _fast_yaml_dump(v, buf, indent + '  ')
+            elif isinstance(v, (list, tuple)) and v:
+                buf.append(f'{indent}{key}:\n')
+                _fast_yaml_dump(v, buf, indent)
+            else:
+                buf.append(f'{indent}{key}: {_yaml_value(v)}\n')
+    else:
+        for v in obj:
+            if isinstance(v, (dict, list, tuple)) and v:
+                # emit the item one level deeper, then hang its first line off the '- '
+                start = len(buf)
+                _fast_yaml_dump(v, buf, indent + '  ')
+                buf[start] = f'{indent}- ' + buf[start][len(indent) + 2:]
+            else:
+                buf.append(f'{indent}- {_yaml_value(v)}\n')
+
+
+def run_tasks(tasks, jobs, add_rows, procs=()):
+    """Run (func, args) tasks, up to jobs at a time, passing each result list to add_rows.
+    A failing task is warned about and counts as no rows. On Ctrl-C, tasks not yet started are
+    dropped and the process groups in procs (the tasks' run_jsonl children) are killed before
+    KeyboardInterrupt propagates."""
+    ex = None
+    try:
+        if jobs <= 1:
+            for func, pargs in tasks:
+                try:
+                    rows = func(*pargs)
+                except Exception as e:
+                    print(f'[warn] task failed: {e}', file=sys.stderr)
+                    rows = []
+                add_rows(rows)
+            return
+        # Not a `with` block: on Ctrl-C its exit would wait for every queued task
+        ex = ThreadPoolExecutor(max_workers=jobs)
+        futs = [ex.submit(func, *pargs) for func, pargs in tasks]
+        for fut in as_completed(futs):
+            try:
+                rows = fut.result()
+            except Exception as e:
+                print(f'[warn] task failed: {e}', file=sys.stderr)
+                rows = []
+            add_rows(rows)
+        ex.shutdown()
+    except KeyboardInterrupt:
+        if ex is not None:
+            ex.shutdown(wait=False, cancel_futures=True)
+        # children run in their own sessions, out of reach of the terminal's Ctrl-C
+        for p in list(procs):
+            _kill_group(p)
+        raise
+
+
+def meta_text(meta):
+    """meta-*.yaml text: the fast emitter's, or PyYAML's (else indented JSON, which YAML reads too)
+    when meta holds something the fast emitter cannot write."""
+    buf = []
+    try:
+        _fast_yaml_dump(meta, buf)
+        return ''.join(buf)
+    except TypeError:
+        # params.yaml can carry types the fast emitter does not know (dates, ...)
+        if yaml is not None:
+            return yaml.dump(meta, Dumper=YamlDumper, sort_keys=False)
+        return json.dumps(meta, indent=2, default=str)
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument('--params', default=str(ROOT / 'bench' / 'params.yaml'))
@@ -405,13 +638,17 @@ def main():
     ap.add_argument('--release', action='store_true')
     ap.add_argument('--timeout-seconds', type=float, default=0.0, help='per-process timeout (0 = no timeout)')
     ap.add_argument('--quick', action='store_true', help='run a minimal matrix for fast iteration')
-    ap.add_argument('--jobs', type=int, default=1, help='parallel jobs for non-Rust implementations')
+    ap.add_argument('--jobs', type=int, default=1, help='parallel benchmark processes across the whole matrix (Rust runs first, one at a time, with nothing else running)')
     ap.add_argument('--smoke', action='store_true', help='use bench/smoke_matrix.yaml and enforce basic invariants')
     ap.add_argument('--parity', action='store_true', help='check simple cross-impl parity on grid graphs')
     ap.add_argument('--shared-inputs', action='store_true', help='use canonical shared graph+sources files for supported implementations')
+    ap.add_argument('--skip-validation', action='store_true', help='skip schema, --smoke invariant and --parity checks for trusted runs (their counts are null in meta)')
+    ap.add_argument('--meta-msgpack', action='store_true', help='also write meta-<stamp>.msgpack for machine consumers (requires msgpack)')
     ap.add_argument('--include-impls', default='', help='comma-separated list of impl keys to include (rust,c,cpp,kotlin,crystal,elixir,erlang,nim)')
     ap.add_argument('--exclude-impls', default='', help='comma-separated list of impl keys to exclude')
     args = ap.parse_args()
+    if args.meta_msgpack and msgpack is None:
+        raise SystemExit('--meta-msgpack requires msgpack (pip install -r bench/requirements.txt)')
 
     # build
     if args.release:
@@ -473,9 +710,9 @@ def main():
     if yaml is not None:
         try:
             if args.smoke and (ROOT / 'bench' / 'smoke_matrix.yaml').exists():
-                cfg = yaml.safe_load(open(ROOT / 'bench' / 'smoke_matrix.yaml'))
+                cfg = yaml.load(open(ROOT / 'bench' / 'smoke_matrix.yaml'), Loader=YamlLoader)
             else:
-                cfg = yaml.safe_load(open(args.params))
+                cfg = yaml.load(open(args.params), Loader=YamlLoader)
         except Exception:
             cfg = default_cfg()
     else:
@@ -497,7 +734,7 @@ def main():
     # Load schema validator (optional)
     validator = None
     schema_path = ROOT / 'bench' / 'schema.json'
-    if SchemaValidator is not None and schema_path.exists():
+    if not args.skip_validation and SchemaValidator is not None and schema_path.exists():
         try:
             schema = json.loads(schema_path.read_text())
             validator = SchemaValidator(schema)
@@ -509,11 +746,17 @@ def main():
     invariant_violations = 0
     parity_issues = 0
     threads_list = cfg.get('threads', [1])
+    check_invariants = args.smoke and not args.skip_validation
     def maybe_validate_and_add(rows):
         nonlocal invalid_rows, invariant_violations
         for r in rows:
             if 'threads' not in r:
                 r['threads'] = 1
+            # every parsed row carries its own copy of these few distinct labels; share one object each
+            for f in INTERN_FIELDS:
+                v = r.get(f)
+                if type(v) is str:
+                    r[f] = sys.intern(v)
             if validator is not None:
                 try:
                     validator.validate(r)
@@ -521,7 +764,7 @@ def main():
                     invalid_rows += 1
                     print(f'[warn] invalid row skipped: {e}', file=sys.stderr)
                     continue
-            if args.smoke:
+            if check_invariants:
                 ok = True
                 if not (r.get('time_ns', 0) > 0): ok = False
                 if not (r.get('popped', 0) >= 0): ok = False
@@ -533,98 +776,61 @@ def main():
                     continue
             all_rows.append(r)
 
+    # Shared inputs depend only on (graph, k): build every distinct one up front, in parallel
+    # processes since generation is CPU-bound, before any benchmark subprocess starts.
+    # shared_by_cell: (graph index, k) -> (graph_path, sources_path)
+    shared_by_cell = {}
+    if args.shared_inputs and sel & {'rust', 'c', 'cpp'}:
+        if np is None:
+            raise SystemExit('--shared-inputs requires numpy (pip install -r bench/requirements.txt)')
+        graph_json = [json.dumps(g, sort_keys=True) for g in cfg['graphs']]
+        cell_keys = {}
+        pending = {}
+        for (gi, g), k in product(enumerate(cfg['graphs']), cfg['sources_k']):
+            key = cfg_key_blob(g, k, cfg['seed'], cfg['maxw'], graph_json[gi])
+            cell_keys[gi, k] = key
+            pending.setdefault(key, (g, k, cfg['seed'], cfg['maxw'], out_dir, key))
+        if len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=min(len(pending), os.cpu_count() or 1)) as ex:
+                shared_by_key = dict(zip(pending, ex.map(_gen, pending.values())))
+        else:
+            shared_by_key = {key: _gen(a) for key, a in pending.items()}
+        shared_by_cell = {cell: shared_by_key[key] for cell, key in cell_keys.items()}
+
+    bins = {'crystal': crystal_bin, 'c': c_bin, 'cpp': cpp_bin, 'kotlin': kotlin_jar,
+            'elixir': elixir_exs, 'erlang': erlang_beam, 'nim': nim_bin}
+
+    live = set()  # Popen of every running benchmark, killed on Ctrl-C
+    run = partial(run_impl, procs=live)
+
+    def cell_tasks(gi, g, B, k):
+        rust_tasks, tasks = [], []
+        shared = shared_by_cell.get((gi, k))
+        common = (g, B, k, cfg['trials'], cfg['seed'], cfg['maxw'], args.timeout_seconds, shared)
+        if 'rust' in sel:
+            # Rust: one task per thread count
+            for th in threads_list:
+                rust_tasks.append((run, (SPECS['rust'], rust_bin) + common + (th,)))
+        for key, bin_path in bins.items():
+            if key in sel and bin_path is not None:
+                tasks.append((run, (SPECS[key], bin_path) + common))
+        return rust_tasks, tasks
+
     try:
-        for g in cfg['graphs']:
-            for B in cfg['bounds']:
-                for k in cfg['sources_k']:
-                    # Rust: run serially across thread counts to avoid CPU contention
-                    if 'rust' in sel:
-                        for th in threads_list:
-                            shared = None
-                            if args.shared_inputs:
-                                shared = generate_shared_inputs(g, k, cfg['seed'], cfg['maxw'], out_dir)
-                            rows = run_rust(g, B, k, cfg['trials'], cfg['seed'], cfg['maxw'], th, rust_bin, timeout_s=args.timeout_seconds, shared_inputs=shared)
-                            maybe_validate_and_add(rows)
-
-                    # Prepare non-Rust tasks
-                    tasks = []
-                    if 'crystal' in sel and crystal_bin is not None:
-                        # Crystal: no shared-input support yet
-                        tasks.append((run_crystal, (crystal_bin, g, B, k, cfg['trials'], cfg['seed'], cfg['maxw'], args.timeout_seconds)))
-                    if 'c' in sel and c_bin is not None:
-                        shared = None
-                        if args.shared_inputs:
-                            shared = generate_shared_inputs(g, k, cfg['seed'], cfg['maxw'], out_dir)
-                        tasks.append((run_c, (c_bin, g, B, k, cfg['trials'], cfg['seed'], cfg['maxw'], args.timeout_seconds, shared)))
-                    if 'cpp' in sel and cpp_bin is not None:
-                        shared = None
-                        if args.shared_inputs:
-                            shared = generate_shared_inputs(g, k, cfg['seed'], cfg['maxw'], out_dir)
-                        tasks.append((run_cpp, (cpp_bin, g, B, k, cfg['trials'], cfg['seed'], cfg['maxw'], args.timeout_seconds, shared)))
-                    if 'kotlin' in sel and kotlin_jar is not None:
-                        tasks.append((run_kotlin, (kotlin_jar, g, B, k, cfg['trials'], cfg['seed'], cfg['maxw'], args.timeout_seconds)))
-                    if 'elixir' in sel and elixir_exs is not None:
-                        tasks.append((run_elixir, (elixir_exs, g, B, k, cfg['trials'], cfg['seed'], cfg['maxw'], args.timeout_seconds)))
-                    if 'erlang' in sel and erlang_beam is not None:
-                        tasks.append((run_erlang, (erlang_beam, g, B, k, cfg['trials'], cfg['seed'], cfg['maxw'], args.timeout_seconds)))
-                    if 'nim' in sel and nim_bin is not None:
-                        tasks.append((run_nim, (nim_bin, g, B, k, cfg['trials'], cfg['seed'], cfg['maxw'], args.timeout_seconds)))
-
-                    if tasks:
-                        if args.jobs <= 1:
-                            for func, pargs in tasks:
-                                try:
-                                    rows = func(*pargs)
-                                except Exception as e:
-                                    print(f'[warn] task failed: {e}', file=sys.stderr)
-                                    rows = []
-                                maybe_validate_and_add(rows)
-                        else:
-                            with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as ex:
-                                futs = [ex.submit(func, *pargs) for func, pargs in tasks]
-                                for fut in as_completed(futs):
-                                    try:
-                                        rows = fut.result()
-                                    except Exception as e:
-                                        print(f'[warn] task failed: {e}', file=sys.stderr)
-                                        rows = []
-                                    maybe_validate_and_add(rows)
+        # Build every (graph, B, k) cell's tasks up front so --jobs spans the whole matrix
+        cells = [cell_tasks(gi, g, B, k) for (gi, g), B, k in product(enumerate(cfg['graphs']), cfg['bounds'], cfg['sources_k'])]
+        # Rust sweeps thread counts on pinned CPUs: run it serially and alone, so no other
+        # benchmark competes for its cores, then the rest of the matrix --jobs at a time
+        run_tasks([t for rust_tasks, _ in cells for t in rust_tasks], 1, maybe_validate_and_add, live)
+        run_tasks([t for _, tasks in cells for t in tasks], args.jobs, maybe_validate_and_add, live)
     except KeyboardInterrupt:
         # Graceful: write partial files with -partial suffix
-        stamp_part = stamp + '-partial'
-        jsonl = out_dir / f'raw-{stamp_part}.jsonl'
-        with open(jsonl, 'w') as f:
-            for r in all_rows:
-                f.write(json.dumps(r) + '\n')
-        csv_path = out_dir / f'agg-{stamp_part}.csv'
-        keys = ['impl', 'lang', 'graph', 'n', 'm', 'k', 'B', 'seed', 'threads', 'time_ns', 'popped', 'edges_scanned', 'heap_pushes', 'B_prime', 'mem_bytes']
-        with open(csv_path, 'w', newline='') as f:
-            w = csv.writer(f)
-            w.writerow(keys)
-            for r in all_rows:
-                w.writerow([r.get(k) for k in keys])
+        jsonl, csv_path = _dump(all_rows, out_dir, stamp + '-partial')
         print(f'[info] Interrupted. Wrote partial outputs: {jsonl} and {csv_path}', file=sys.stderr)
         return
 
     # write jsonl and csv
-    jsonl = out_dir / f'raw-{stamp}.jsonl'
-    with open(jsonl, 'w') as f:
-        for r in all_rows:
-            f.write(json.dumps(r) + '\n')
-
-    csv_path = out_dir / f'agg-{stamp}.csv'
-    keys = ['impl', 'lang', 'graph', 'n', 'm', 'k', 'B', 'seed', 'threads', 'time_ns', 'popped', 'edges_scanned', 'heap_pushes', 'B_prime', 'mem_bytes']
-    with open(csv_path, 'w', newline='') as f:
-        w = csv.writer(f)
-        w.writerow(keys)
-        for r in all_rows:
-            # default threads to 1 if not present
-            if 'threads' not in r:
-                r['threads'] = 1
-            # Normalize impl key (some emit 'impl' already; Rust uses serde rename)
-            if 'impl' not in r and 'impl_' in r:
-                r['impl'] = r.get('impl_')
-            w.writerow([r.get(k) for k in keys])
+    jsonl, csv_path = _dump(all_rows, out_dir, stamp)
 
     # Metadata file
     try:
@@ -638,7 +844,28 @@ def main():
     except Exception:
         commit = ''
     params_blob = json.dumps(cfg, sort_keys=True).encode('utf-8')
-    params_hash = hashlib.sha256(params_blob).hexdigest()[:16]
+    params_hash = hashlib.blake2b(params_blob, digest_size=8).hexdigest()
+    # Optional parity check: only for grid graphs, verify n/m consistency across implementations per config
+    if args.parity and not args.skip_validation:
+        try:
+            # one pass: remember the first (n, m) per grid config; report each config at most once
+            reported = object()
+            seen = {}
+            for r in all_rows:
+                gc = r.get('graph_cfg') or {}
+                if r.get('graph') != 'grid' or not isinstance(gc, dict):
+                    continue
+                key = (gc.get('rows'), gc.get('cols'), r.get('B'), r.get('k'))
+                nm = (r.get('n'), r.get('m'))
+                prev = seen.setdefault(key, nm)
+                if prev is not reported and prev != nm:
+                    parity_issues += 1
+                    print(f"[warn] parity mismatch for grid{key}: n={ {prev[0], nm[0]} }, m={ {prev[1], nm[1]} }", file=sys.stderr)
+                    seen[key] = reported
+        except Exception as e:
+            print(f"[warn] parity check failed: {e}", file=sys.stderr)
+    # meta is assembled once, after every check has run, and not touched again before it is written
+    skipped = args.skip_validation
     meta = {
         'stamp': stamp,
         'host': host,
@@ -647,39 +874,18 @@ def main():
         'params_hash': params_hash,
         'params': cfg,
         'rows': len(all_rows),
-        'invalid_rows_skipped': invalid_rows,
-        'invariant_violations': invariant_violations,
-        'parity_issues': 0,
+        'invalid_rows_skipped': None if skipped else invalid_rows,
+        'invariant_violations': None if skipped else invariant_violations,
+        'parity_issues': None if skipped else parity_issues,
     }
-    # Optional parity check: only for grid graphs, verify n/m consistency across implementations per config
-    if args.parity:
-        try:
-            from collections import defaultdict
-            groups = defaultdict(list)
-            for r in all_rows:
-                gc = r.get('graph_cfg') or {}
-                if r.get('graph') == 'grid' and isinstance(gc, dict):
-                    key = (gc.get('rows'), gc.get('cols'), r.get('B'), r.get('k'))
-                    groups[key].append(r)
-            for key, rows in groups.items():
-                ns = {r.get('n') for r in rows}
-                ms = {r.get('m') for r in rows}
-                if len(ns) > 1 or len(ms) > 1:
-                    parity_issues += 1
-                    print(f"[warn] parity mismatch for grid{key}: n={ns}, m={ms}", file=sys.stderr)
-        except Exception as e:
-            print(f"[warn] parity check failed: {e}", file=sys.stderr)
-        meta['parity_issues'] = parity_issues
     meta_path = out_dir / f'meta-{stamp}.yaml'
     try:
-        if yaml is not None:
-            with open(meta_path, 'w') as f:
-                yaml.safe_dump(meta, f, sort_keys=False)
-        else:
-            with open(meta_path, 'w') as f:
-                f.write(json.dumps(meta, indent=2))
-    except Exception as e:
+        write_atomic(meta_path, meta_text(meta))
+        if args.meta_msgpack:
+            write_atomic(meta_path.with_suffix('.msgpack'), msgpack.packb(meta, use_bin_type=True, default=str))
+    except OSError as e:
         print(f'[warn] failed to write metadata: {e}', file=sys.stderr)
+        raise
 
     print(f'Wrote {jsonl}, {csv_path}, and {meta_path}')
     if invalid_rows or invariant_violations or parity_issues:
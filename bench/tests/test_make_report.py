@@ -0,0 +1,83 @@
+import pathlib, shutil, sys, tempfile, unittest
+from unittest import mock
+
+BENCH = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BENCH))
+import make_report  # noqa: E402
+
+DATA = pathlib.Path(__file__).resolve().parent / 'data'
+U64_MAX = 18446744073709551615  # B_prime when the bound is never reached
+
+
+class BPrimeSentinelTest(unittest.TestCase):
+    # agg CSVs from Rust/C/C++ carry B_prime = u64::MAX, which does not fit int64
+
+    def setUp(self):
+        # work on a copy so the .feather sidecar cache is not written into the repo
+        self.tmp = pathlib.Path(tempfile.mkdtemp())
+        self.csv = self.tmp / 'agg.csv'
+        shutil.copy(DATA / 'agg-bprime-max.csv', self.csv)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_stream_best(self):
+        cols = make_report.stream_best([self.csv])
+        self.assertEqual(cols['impl'], ['rust-bmssp', 'c-bmssp', 'cpp-bmssp'])
+        self.assertEqual(cols['B_prime'], [U64_MAX] * 3)
+        self.assertIn(str(U64_MAX), make_report.format_md_table(cols))
+
+    @unittest.skipIf(make_report.pd is None, 'pandas not installed')
+    def test_best_frame(self):
+        best = make_report.best_frame(make_report.load_frames([self.csv]))
+        self.assertEqual(list(best['impl']), ['rust-bmssp', 'c-bmssp', 'cpp-bmssp'])
+        self.assertEqual([int(v) for v in best['B_prime']], [U64_MAX] * 3)
+        self.assertIn(str(U64_MAX), make_report.format_md_table(best))
+
+    def test_plots_load_csv(self):
+        try:
+            import plots
+        except ImportError as e:
+            self.skipTest(f'plot dependencies missing: {e}')
+        df = plots.load_csv([str(self.csv)])
+        self.assertEqual(len(df), 4)
+
+
+class WinnerOrderTest(unittest.TestCase):
+    # winners are listed in the order their group first appears, even when a later row wins
+    ROWS = """impl,lang,graph,n,m,k,B,seed,threads,time_ns,popped,edges_scanned,heap_pushes,B_prime,mem_bytes
+zeta,rust,grid,10,20,2,50,1,1,900,5,1,1,50,1
+alpha,rust,grid,10,20,2,50,1,1,800,5,1,1,50,1
+zeta,rust,grid,10,20,2,50,1,1,100,5,1,1,50,1
+"""
+
+    def setUp(self):
+        self.tmp = pathlib.Path(tempfile.mkdtemp())
+        self.csv = self.tmp / 'agg.csv'
+        self.csv.write_text(self.ROWS)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_stream_best(self):
+        cols = make_report.stream_best([self.csv])
+        self.assertEqual(cols['impl'], ['zeta', 'alpha'])
+        self.assertEqual(cols['time_ns'], [100, 800])
+
+    @unittest.skipIf(make_report.pd is None, 'pandas not installed')
+    def test_best_frame_sorted(self):
+        with mock.patch.object(make_report, 'NUMBA_MIN_ROWS', float('inf')):
+            best = make_report.best_frame(make_report.load_frames([self.csv]))
+        self.assertEqual(list(best['impl']), ['zeta', 'alpha'])
+        self.assertEqual(list(best['time_ns']), [100, 800])
+
+    @unittest.skipIf(make_report.pd is None or make_report._argbest_kernel() is None, 'pandas or numba not installed')
+    def test_best_frame_numba(self):
+        with mock.patch.object(make_report, 'NUMBA_MIN_ROWS', 0):
+            best = make_report.best_frame(make_report.load_frames([self.csv]))
+        self.assertEqual(list(best['impl']), ['zeta', 'alpha'])
+        self.assertEqual(list(best['time_ns']), [100, 800])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,234 @@
+import csv, io, os, pathlib, shutil, signal, subprocess, sys, tempfile, threading, time, unittest
+from unittest import mock
+
+BENCH = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BENCH))
+import runner  # noqa: E402
+
+
+class RunJsonlKillTest(unittest.TestCase):
+
+    @unittest.skipIf(sys.platform == 'win32', 'needs sh')
+    def test_timeout_kills_grandchildren(self):
+        # sh forks sleep, which keeps stdout open after sh itself is killed
+        t0 = time.monotonic()
+        with self.assertRaises(subprocess.TimeoutExpired):
+            runner.run_jsonl(['sh', '-c', 'sleep 3; echo x'], 0.5)
+        self.assertLess(time.monotonic() - t0, 2)
+
+    @unittest.skipIf(sys.platform == 'win32', 'needs sh')
+    def test_timeout_after_stdout_closed(self):
+        t0 = time.monotonic()
+        with self.assertRaises(subprocess.TimeoutExpired):
+            runner.run_jsonl(['sh', '-c', 'exec >&-; sleep 3'], 0.5)
+        self.assertLess(time.monotonic() - t0, 2)
+
+    @unittest.skipIf(sys.platform == 'win32', 'needs sh and SIGINT')
+    def test_ctrl_c_kills_pooled_children(self):
+        # children run in their own sessions, so a terminal Ctrl-C reaches only this process
+        live = set()
+        tasks = [(runner.run_jsonl, (['sh', '-c', 'sleep 6'], 0, live))] * 2
+        t0 = time.monotonic()
+        threading.Timer(0.5, os.kill, (os.getpid(), signal.SIGINT)).start()
+        with self.assertRaises(KeyboardInterrupt):
+            runner.run_tasks(tasks, 2, lambda rows: None, live)
+        while live and time.monotonic() - t0 < 5:
+            time.sleep(0.05)
+        self.assertFalse(live)
+        self.assertLess(time.monotonic() - t0, 2)
+
+
+class RunTasksTest(unittest.TestCase):
+
+    def test_failed_task_counts_as_no_rows(self):
+        def boom():
+            raise RuntimeError('no binary')
+        for jobs in (1, 3):
+            got = []
+            runner.run_tasks([(list, ([1, 2],)), (boom, ()), (list, ([3],))], jobs, got.append)
+            self.assertEqual(sorted(got), [[], [1, 2], [3]])
+
+
+class RunImplArgvTest(unittest.TestCase):
+    # argv of the eight hand-written run_* builders that SPECS replaced, as (prefix, flag pairs);
+    # flag order differed between them and does not matter to the implementations' parsers
+    BIN = pathlib.Path('/opt/bmssp/impl/bmssp')
+    PREFIX = {
+        'rust': [str(BIN), '--json'],
+        'crystal': [str(BIN), '--json'],
+        'c': [str(BIN)],
+        'cpp': [str(BIN)],
+        'kotlin': ['java', '-jar', str(BIN), '--json'],
+        'elixir': ['elixir', str(BIN)],
+        'erlang': ['erl', '-noshell', '-pa', str(BIN.parent), '-s', 'bmssp', 'main', '-s', 'init', 'stop', '-extra'],
+        'nim': [str(BIN)],
+    }
+    GRAPHS = {
+        'grid': ({'type': 'grid', 'rows': 3, 'cols': 4}, {'--rows': '3', '--cols': '4'}),
+        'er': ({'type': 'er', 'n': 10, 'p': 0.5}, {'--n': '10', '--p': '0.5'}),
+        'ba': ({'type': 'ba', 'n': 10, 'm': 3}, {'--n': '10', '--m0': '5', '--m': '3'}),
+    }
+    UNSUPPORTED = {('crystal', 'ba'), ('elixir', 'ba'), ('erlang', 'ba')}
+    SHARED = ('rust', 'c', 'cpp')
+    FILES = (pathlib.Path('/tmp/in/graph.txt'), pathlib.Path('/tmp/in/sources.txt'))
+
+    def argv(self, key, graph_cfg, shared_inputs=None):
+        calls = []
+        def fake_run_jsonl(args, timeout_s=0, procs=None):
+            calls.append(args)
+            return [{'impl': key}]
+        with mock.patch.object(runner, 'run_jsonl', fake_run_jsonl), mock.patch.object(runner, 'pin_cpus', lambda a, n: a):
+            rows = runner.run_impl(runner.SPECS[key], self.BIN, graph_cfg, 50, 4, 3, 7, 100, 0, shared_inputs, 2)
+        self.assertEqual(rows, [{'impl': key, 'graph_cfg': graph_cfg}] if calls else [])
+        return calls[0] if calls else None
+
+    def test_matches_baseline_builders(self):
+        for key, prefix in self.PREFIX.items():
+            for gtype, (graph_cfg, graph_flags) in self.GRAPHS.items():
+                for shared in (None, self.FILES):
+                    with self.subTest(impl=key, graph=gtype, shared=bool(shared)):
+                        args = self.argv(key, graph_cfg, shared)
+                        uses_shared = shared is not None and key in self.SHARED
+                        if (key, gtype) in self.UNSUPPORTED and not uses_shared:
+                            self.assertIsNone(args)
+                            continue
+                        want = {'--trials': '3', '--k': '4', '--B': '50', '--seed': '7', '--maxw': '100', '--graph': gtype}
+                        if key == 'rust':
+                            want['--threads'] = '2'
+                        if uses_shared:
+                            want.update({'--graph-file': str(self.FILES[0]), '--sources-file': str(self.FILES[1])})
+                        else:
+                            want.update(graph_flags)
+                        self.assertEqual(args[:len(prefix)], prefix)
+                        rest = args[len(prefix):]
+                        pairs = list(zip(rest[::2], rest[1::2]))
+                        self.assertEqual(len(rest), 2 * len(pairs))
+                        self.assertEqual(len(pairs), len(want))
+                        self.assertEqual(dict(pairs), want)
+
+    def test_unknown_graph_type_is_skipped(self):
+        for key in self.PREFIX:
+            with self.subTest(impl=key):
+                self.assertIsNone(self.argv(key, {'type': 'torus', 'n': 10}))
+
+
+@unittest.skipIf(runner.np is None, 'numpy not installed')
+class ErSamplerTest(unittest.TestCase):
+
+    def test_pair_indices(self):
+        np = runner.np
+        for n, p in ((1, 0.5), (40, 0.05), (300, 0.01), (60, 0.9)):
+            with self.subTest(n=n, p=p):
+                idx = runner.er_pair_indices(np.random.default_rng(7), n, p)
+                self.assertTrue((np.diff(idx) > 0).all())  # sorted, no repeats
+                self.assertTrue(((idx >= 0) & (idx < n * n)).all())
+                # binomial(n*n, p) slots kept; 6 sigma keeps the seeded check far from flaky
+                mean, sd = n * n * p, (n * n * p * (1 - p)) ** 0.5
+                self.assertLessEqual(abs(idx.size - mean), 6 * sd + 1)
+        self.assertEqual(runner.er_pair_indices(np.random.default_rng(7), 10, 0).size, 0)
+        self.assertEqual(runner.er_pair_indices(np.random.default_rng(7), 10, 1).tolist(), list(range(100)))
+
+    def test_shared_graph_file(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        graph_path, _ = runner.generate_shared_inputs({'type': 'er', 'n': 200, 'p': 0.05}, 4, 42, 100, tmp)
+        lines = graph_path.read_text().splitlines()
+        n, m = map(int, lines[0].split())
+        edges = [tuple(map(int, line.split())) for line in lines[1:]]
+        self.assertEqual((n, m), (200, len(edges)))
+        self.assertTrue(all(u != v and 0 <= u < n and 0 <= v < n and 1 <= w <= 100 for u, v, w in edges))
+        self.assertEqual([e[:2] for e in edges], sorted(set(e[:2] for e in edges)))
+
+
+@unittest.skipIf(runner.np is None, 'numpy not installed')
+class BaSamplerTest(unittest.TestCase):
+
+    def test_edges(self):
+        np = runner.np
+        for n, m0, m_each in ((200, 5, 3), (50, 1, 2), (30, 3, 1), (4, 8, 2), (1, 5, 5)):
+            with self.subTest(n=n, m0=m0, m=m_each):
+                edges = runner.ba_edges(np.random.default_rng(3), n, m0, m_each, 100)
+                start = max(1, min(m0, n))
+                n_seed = start * (start - 1)  # directed clique on the first start nodes
+                self.assertEqual(edges.shape, (n_seed + (n - start) * m_each, 3))
+                seed, grown = edges[:n_seed], edges[n_seed:]
+                self.assertTrue(((seed[:, 0] < start) & (seed[:, 1] < start) & (seed[:, 0] != seed[:, 1])).all())
+                self.assertTrue((seed[:, 2] == 1).all())
+                # node u attaches m_each edges to nodes that existed before it
+                u, v, w = grown.T
+                self.assertEqual(u.tolist(), [start + i // m_each for i in range(grown.shape[0])])
+                self.assertTrue(((0 <= v) & (v < u)).all())
+                self.assertTrue(((1 <= w) & (w <= 100)).all())
+
+    def test_seeded(self):
+        np = runner.np
+        a = runner.ba_edges(np.random.default_rng(11), 500, 5, 4, 100)
+        b = runner.ba_edges(np.random.default_rng(11), 500, 5, 4, 100)
+        self.assertTrue((a == b).all())
+
+
+class CsvLinesTest(unittest.TestCase):
+
+    @staticmethod
+    def reference(rows):
+        # the baseline writer: csv.writer over r.get(k), with impl taken from impl_ when absent
+        buf = io.StringIO()
+        w = csv.writer(buf)
+        for r in rows:
+            r = dict(r)
+            if 'impl' not in r and 'impl_' in r:
+                r['impl'] = r['impl_']
+            w.writerow([r.get(k) for k in runner.CSV_KEYS])
+        return buf.getvalue()
+
+    def test_matches_csv_writer(self):
+        base = {'impl': 'rust-bmssp', 'lang': 'Rust', 'graph': 'grid', 'n': 2500, 'm': 9800, 'k': 4, 'B': 50, 'seed': 1,
+                'threads': 1, 'time_ns': 741251, 'popped': 868, 'edges_scanned': 3423, 'heap_pushes': 1047,
+                'B_prime': 18446744073709551615, 'mem_bytes': 241824, 'graph_cfg': {'type': 'grid', 'rows': 50}}
+        rows = [
+            base,
+            dict(base, mem_bytes=None, B_prime=None),
+            dict(base, impl=None),
+            {k: v for k, v in base.items() if k not in ('mem_bytes', 'threads')},
+            dict(base, impl='a,b'),
+            dict(base, lang='say "hi"'),
+            dict(base, graph='x\ny'),
+            dict(base, graph='x\r\ny'),
+            dict(base, graph='x\r'),
+            dict(base, graph='"a,b"\n'),
+            dict(base, graph='None'),
+            dict(base, graph='', time_ns=1.5, popped=True),
+            {k: v for k, v in base.items() if k != 'impl'},
+            dict({k: v for k, v in base.items() if k != 'impl'}, impl_='c-bmssp'),
+            dict(base, impl_='ignored-when-impl-is-set'),
+            {},
+        ]
+        self.assertEqual(''.join(runner._csv_lines(rows)), self.reference(rows))
+
+
+@unittest.skipIf(runner.yaml is None, 'PyYAML not installed')
+class FastYamlDumpTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        # exponent floats without a '.', e.g. repr(5e-05), are strings to YAML 1.1
+        meta = {
+            'params': {'graphs': [{'type': 'er', 'n': 2000, 'p': 0.00005}, {'type': 'grid', 'rows': 30, 'cols': 30}],
+                       'bounds': [50, 1e16], 'scale': [1.5, -2e-07, float('inf')], 'threads': []},
+            'host': {'system': 'Linux', 'release': '6.1.0-13-amd64', 'note': 'yes'},
+            'skip_validation': False,
+            'commit': None,
+        }
+        buf = []
+        runner._fast_yaml_dump(meta, buf)
+        self.assertEqual(runner.yaml.safe_load(''.join(buf)), meta)
+
+    def test_non_ascii_falls_back_to_pyyaml(self):
+        # json.dumps would write U+1F600 as a surrogate pair, which YAML loads as two lone surrogates
+        meta = {'host': {'node': 'büro-\U0001F600', 'user': 'Zoë'}, 'p': 5e-05}
+        with self.assertRaises(TypeError):
+            runner._fast_yaml_dump(meta, [])
+        self.assertEqual(runner.yaml.safe_load(runner.meta_text(meta)), meta)
+
+
+if __name__ == '__main__':
+    unittest.main()
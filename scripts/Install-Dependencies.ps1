@@ -57,7 +57,7 @@ if (-not (Have 'python') -and -not (Have 'python3')) {
 } else { Write-Host "[ok] Python present" }
 if (-not $CheckOnly) {
   try { python -m pip --version *>$null } catch { }
-  try { python -m pip install --user pyyaml matplotlib *>$null } catch { }
+  try { python -m pip install --user pyyaml matplotlib pandas *>$null } catch { }
 }
 
 Write-Host "==> Build tools (MSVC)"
@@ -90,7 +90,7 @@ if have python3; then
     if [[ -f "bench/requirements.txt" ]]; then
       python3 -m pip install --user -r bench/requirements.txt || python3 -m pip install --user --break-system-packages -r bench/requirements.txt || true
     else
-      python3 -m pip install --user pyyaml matplotlib jsonschema || python3 -m pip install --user --break-system-packages pyyaml matplotlib jsonschema || true
+      python3 -m pip install --user pyyaml matplotlib pandas jsonschema || python3 -m pip install --user --break-system-packages pyyaml matplotlib pandas jsonschema || true
     fi
   fi
 fi